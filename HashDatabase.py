@@ -0,0 +1,179 @@
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Union
+
+
+class Hash_Database:
+    """
+    Loads and saves a `{hash: path}` database either as a single json file or sharded into `<prefix>.json` files inside a directory, partitioned by the first `prefix_length` characters of each digest.
+    """
+
+    def __init__(self, path: Path, sharded: Union[bool, None] = None, prefix_length: int = 2, read_only: bool = False) -> None:
+        """
+        Properties:
+            _path (Path) : The json file or shard directory of the database.
+            _sharded (bool) : If the database is split into shard files. Defaults to True when `path` is a directory, or does not exist yet and has no suffix.
+            _prefix_length (int) : The number of digest characters used to pick a shard. Defaults to 2 (256 shards)
+            _read_only (bool) : If `save()` is disabled, used for reference databases. Defaults to False
+
+        """
+        self._logger = logging.getLogger()
+        self._path: Path = path
+        if sharded is None:
+            sharded = path.is_dir() or (not path.exists() and path.suffix == "")
+        self._sharded: bool = sharded
+        self._prefix_length: int = prefix_length
+        self._read_only: bool = read_only
+        # shard contents as last loaded/saved; unchanged shards are skipped on save.
+        self._shards: dict[str, dict[str, str]] = {}
+
+    @property
+    def path(self) -> Path:
+        """
+        The json file or shard directory of the database.
+
+        Returns:
+            Path: The `_path` value.
+        """
+        return self._path
+
+    @property
+    def sharded(self) -> bool:
+        """
+        If the database is split into `<prefix>.json` shard files.
+
+        Returns:
+            bool: The `_sharded` value.
+        """
+        return self._sharded
+
+    @property
+    def read_only(self) -> bool:
+        """
+        If `save()` is disabled for this database.
+
+        Returns:
+            bool: The `_read_only` value.
+        """
+        return self._read_only
+
+    def _read(self, file: Path) -> dict[str, str]:
+        """
+        Reads a single json file of `{hash: path}` entries.
+
+        Args:
+            file (Path): The json file to read.
+
+        Returns:
+            dict[str, str]: The file contents, empty if the file is missing, empty or can't be read.
+        """
+        if not file.exists():
+            return {}
+        if not file.is_file():
+            self._logger.error(f"We encountered an Error when loading {file.as_posix()} | Exception: Not a file.")
+            return {}
+        try:
+            if file.stat().st_size == 0:
+                return {}
+            with open(file) as temp_file:
+                hashes = json.load(temp_file)
+        except (OSError, UnicodeDecodeError) as e:
+            self._logger.error(f"We encountered an Error when loading {file.as_posix()} | Exception: {e}")
+            return {}
+        except json.decoder.JSONDecodeError as e:
+            self._logger.error(f"We encountered a Decode Error when loading {file.as_posix()} | Exception: {e}")
+            return {}
+
+        if not isinstance(hashes, dict):
+            self._logger.error(f"We encountered an Error when loading {file.as_posix()} | Exception: Expected a json object of hashes.")
+            return {}
+        return hashes
+
+    def _write(self, file: Path, hashes: dict[str, str]) -> None:
+        """
+        Writes `hashes` to a temp file and replaces `file` with it so other readers never see a partial database.
+
+        Args:
+            file (Path): The json file to write.
+            hashes (dict[str, str]): The `{hash: path}` entries.
+        """
+        temp_path: Path = file.with_name(file.name + ".tmp")
+        with open(temp_path, "w") as temp_file:
+            json.dump(hashes, temp_file, indent="\n")
+        os.replace(temp_path, file)
+
+    def load(self) -> dict[str, str]:
+        """
+        Loads every entry of the database.
+
+        Returns:
+            dict[str, str]: The `{hash: path}` entries, empty if the database does not exist yet.
+        """
+        if not self._sharded:
+            return self._read(self._path)
+
+        hashes: dict[str, str] = {}
+        self._shards = {}
+        if not self._path.exists():
+            return hashes
+        if not self._path.is_dir():
+            self._logger.error(f"We encountered an Error when loading {self._path.as_posix()} | Exception: A sharded hash database must be a directory.")
+            return hashes
+        for file in sorted(self._path.glob("*.json")):
+            shard: dict[str, str] = self._read(file)
+            self._shards[file.stem] = dict(shard)
+            hashes.update(shard)
+        return hashes
+
+    def save(self, hashes: dict[str, str]) -> None:
+        """
+        Saves `hashes` to the database, for sharded databases only the shards that changed are written.
+
+        Args:
+            hashes (dict[str, str]): The `{hash: path}` entries.
+
+        Raises:
+            PermissionError: The database is read only.
+        """
+        if self._read_only:
+            raise PermissionError(f"The hash database {self._path.as_posix()} is read only.")
+
+        if not self._sharded:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            self._write(self._path, hashes)
+            return
+
+        shards: dict[str, dict[str, str]] = {}
+        for image_hash, image_path in hashes.items():
+            shards.setdefault(image_hash[:self._prefix_length], {})[image_hash] = image_path
+
+        self._path.mkdir(parents=True, exist_ok=True)
+        for prefix, shard in shards.items():
+            if self._shards.get(prefix) == shard:
+                continue
+            self._write(self._path.joinpath(prefix + ".json"), shard)
+            self._shards[prefix] = shard
+
+    @staticmethod
+    def merge(sources: list["Hash_Database"], output: "Hash_Database") -> int:
+        """
+        Combines the entries of every `sources` database into `output` in a single pass over each database.\n
+        Existing `output` entries win, then `sources` in the order given; so the first node to record a hash keeps its path.
+
+        Args:
+            sources (list[Hash_Database]): The databases to merge, json files or shard directories.
+            output (Hash_Database): The database to merge into.
+
+        Returns:
+            int: The number of entries added to `output`.
+        """
+        hashes: dict[str, str] = output.load()
+        existing: int = len(hashes)
+        for source in sources:
+            for image_hash, image_path in source.load().items():
+                hashes.setdefault(image_hash, image_path)
+
+        output.save(hashes)
+        return len(hashes) - existing
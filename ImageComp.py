@@ -35,6 +35,16 @@ class Image_Comparison:
         """
         return f"Time taken {'{:.2f}'.format(self._etime)} seconds, with a {self._p_match}% match."
 
+    @property
+    def p_match(self) -> int | None:
+        """
+        Get the match percentage of the recent `compare()`.
+
+        Returns:
+            int | None: 0-100 Percent value, None if `compare()` has not completed.
+        """
+        return getattr(self, "_p_match", None)
+
     @property
     def match_percent(self) -> int:
         """
@@ -0,0 +1,344 @@
+# Image Comparison Calibration
+# Sweeps Image_Comparison parameters over labeled image pairs to trade throughput against accuracy.
+
+import csv
+import io
+import json
+import logging
+import sys
+import time
+from argparse import ArgumentParser, Namespace
+from itertools import product
+from pathlib import Path
+from typing import Callable, TypedDict, Union
+
+from PIL import Image, ImageEnhance
+from PIL.Image import Image as IMG
+from PIL.Image import Resampling
+
+from ImageComp import Image_Comparison
+
+
+class ComparisonPair(TypedDict):
+    """`name: str` \n
+    `source: IMG` \n
+    `comparison: IMG` \n
+    `duplicate: bool`"""
+    name: str
+    source: IMG
+    comparison: IMG
+    duplicate: bool
+
+
+class CalibrationResult(TypedDict):
+    """`match_percent: int` \n
+    `line_detect: int` \n
+    `sample_percent: int` \n
+    `sample_dimensions: tuple[int, int]` \n
+    `precision: float` \n
+    `recall: float` \n
+    `comparisons_per_second: float`"""
+    match_percent: int
+    line_detect: int
+    sample_percent: int
+    sample_dimensions: tuple[int, int]
+    precision: float
+    recall: float
+    comparisons_per_second: float
+
+
+class Image_Calibration:
+    """
+    Runs `Image_Comparison.compare()` over labeled duplicate/non-duplicate pairs for a grid of parameters and reports comparisons/s alongside precision and recall.
+    """
+
+    def __init__(self) -> None:
+        """
+        Properties:
+            _pairs (list[ComparisonPair]) : The labeled image pairs to compare.
+            _transforms (dict[str, Callable[[IMG], IMG]]) : The transforms used by `generate_pairs()` to create duplicates.
+
+        """
+        self._logger = logging.getLogger()
+        self._pairs: list[ComparisonPair] = []
+        self._transforms: dict[str, Callable[[IMG], IMG]] = {
+            "resize": self._resize,
+            "recompress": self._recompress,
+            "crop": self._crop,
+            "color-shift": self._color_shift}
+
+    @property
+    def pairs(self) -> list[ComparisonPair]:
+        """
+        The labeled image pairs loaded by `load_pairs()` or `generate_pairs()`.
+
+        Returns:
+            list[ComparisonPair]: The `_pairs` value.
+        """
+        return self._pairs
+
+    def _open(self, path: Path) -> IMG:
+        """
+        Opens and fully loads an image so later comparisons are not timing file IO.
+
+        Args:
+            path (Path): The image path.
+
+        Returns:
+            IMG: PIL Image
+        """
+        with Image.open(path) as image:
+            image.load()
+            return image.copy()
+
+    def _resize(self, image: IMG) -> IMG:
+        """Halves the image dimensions."""
+        return image.resize(size=(max(1, image.width // 2), max(1, image.height // 2)), resample=Resampling.BICUBIC)
+
+    def _recompress(self, image: IMG) -> IMG:
+        """Re-encodes the image as a quality 40 JPEG."""
+        buffer = io.BytesIO()
+        image.convert("RGB").save(buffer, format="JPEG", quality=40)
+        buffer.seek(0)
+        with Image.open(buffer) as recompressed:
+            recompressed.load()
+            return recompressed.copy()
+
+    def _crop(self, image: IMG) -> IMG:
+        """Removes a 5% border from each side of the image."""
+        x: int = int(image.width * 0.05)
+        y: int = int(image.height * 0.05)
+        return image.crop((x, y, image.width - x, image.height - y))
+
+    def _color_shift(self, image: IMG) -> IMG:
+        """Boosts saturation by 50% and brightness by 10%."""
+        image = ImageEnhance.Color(image.convert("RGB")).enhance(1.5)
+        return ImageEnhance.Brightness(image).enhance(1.1)
+
+    def load_pairs(self, pair_file: Path) -> list[ComparisonPair]:
+        """
+        Loads labeled pairs from a CSV file with the columns `source,comparison,duplicate`. \n
+        Relative image paths are resolved against the CSV file's directory, `duplicate` accepts `1/0`, `true/false` or `y/n`.
+
+        Args:
+            pair_file (Path): The CSV file.
+
+        Raises:
+            ValueError: The CSV file is missing a column or has an invalid `duplicate` value.
+
+        Returns:
+            list[ComparisonPair]: The loaded pairs, also stored in `_pairs`.
+        """
+        with open(pair_file, newline="") as temp_file:
+            for row in csv.DictReader(temp_file):
+                try:
+                    source: Path = pair_file.parent.joinpath(row["source"].strip())
+                    comparison: Path = pair_file.parent.joinpath(row["comparison"].strip())
+                    label: str = row["duplicate"].strip().lower()
+                except (KeyError, AttributeError):
+                    raise ValueError(f"{pair_file.as_posix()} must have the columns `source,comparison,duplicate`.")
+                if label not in ("1", "0", "true", "false", "y", "n"):
+                    raise ValueError(f"You provided an invalid duplicate value. Value: {label} - Options: 1/0, true/false, y/n")
+
+                self._pairs.append({
+                    "name": f"{source.name} | {comparison.name}",
+                    "source": self._open(source),
+                    "comparison": self._open(comparison),
+                    "duplicate": label in ("1", "true", "y")})
+
+        return self._pairs
+
+    def generate_pairs(self, sample_dir: Path, file_types: tuple[str, ...] = (".png", ".jpg", ".webp", ".jpeg")) -> list[ComparisonPair]:
+        """
+        Generates labeled pairs from the images in `sample_dir` using `_transforms`. \n
+        Each image is paired with every transform of itself as a duplicate and every transform of the next image as a non-duplicate.
+
+        Args:
+            sample_dir (Path): The directory of sample images.
+            file_types (tuple[str, ...], optional): The image suffixes to use. Defaults to (".png", ".jpg", ".webp", ".jpeg").
+
+        Raises:
+            ValueError: Less than two sample images were found.
+
+        Returns:
+            list[ComparisonPair]: The generated pairs, also stored in `_pairs`.
+        """
+        samples: list[Path] = sorted(file for file in sample_dir.iterdir() if file.is_file() and file.name.lower().endswith(file_types))
+        if len(samples) < 2:
+            raise ValueError(f"You must provide at least 2 sample images to generate pairs. Found: {len(samples)}")
+
+        images: list[IMG] = [self._open(sample) for sample in samples]
+        for index, image in enumerate(images):
+            other: int = (index + 1) % len(images)
+            for name, transform in self._transforms.items():
+                self._pairs.append({"name": f"{samples[index].name} | {name}", "source": image, "comparison": transform(image), "duplicate": True})
+                self._pairs.append({"name": f"{samples[index].name} | {samples[other].name} {name}", "source": image, "comparison": transform(images[other]), "duplicate": False})
+
+        return self._pairs
+
+    def _score(self, p_matches: list[int], match_percent: int) -> tuple[float, float]:
+        """
+        Calculates the precision and recall of `_pairs` if every pair at or above `match_percent` is called a duplicate.
+
+        Args:
+            p_matches (list[int]): The match percent of each entry in `_pairs`.
+            match_percent (int): The match threshold.
+
+        Returns:
+            tuple[float, float]: precision, recall. Each is 1.0 when it has nothing to measure.
+        """
+        true_pos: int = 0
+        false_pos: int = 0
+        false_neg: int = 0
+        for pair, p_match in zip(self._pairs, p_matches):
+            found: bool = p_match >= match_percent
+            if found and pair["duplicate"]:
+                true_pos += 1
+            elif found:
+                false_pos += 1
+            elif pair["duplicate"]:
+                false_neg += 1
+
+        precision: float = true_pos / (true_pos + false_pos) if true_pos + false_pos else 1.0
+        recall: float = true_pos / (true_pos + false_neg) if true_pos + false_neg else 1.0
+        return precision, recall
+
+    def sweep(self, match_percents: list[int], line_detects: list[int], sample_percents: list[int], sample_dimensions: list[tuple[int, int]]) -> list[CalibrationResult]:
+        """
+        Compares every entry of `_pairs` for each `line_detect`, `sample_percent` and `sample_dimensions` combination. \n
+        `match_percent` only changes the threshold applied to the match percent, so it is scored from the same comparisons without re-running them.
+
+        Args:
+            match_percents (list[int]): 0-100 Percent values.
+            line_detects (list[int]): 0-255 Pixel values.
+            sample_percents (list[int]): 1-100 Percent values.
+            sample_dimensions (list[tuple[int, int]]): The dimensions to scale images to.
+
+        Raises:
+            ValueError: No pairs have been loaded or generated.
+
+        Returns:
+            list[CalibrationResult]: One result per parameter combination.
+        """
+        if not len(self._pairs):
+            raise ValueError("You must load or generate pairs before sweeping.")
+
+        results: list[CalibrationResult] = []
+        for line_detect, sample_percent, dimensions in product(line_detects, sample_percents, sample_dimensions):
+            comparator = Image_Comparison()
+            comparator.set_line_detect(line_detect)
+            comparator.set_sample_percent(sample_percent)
+            comparator.set_sample_resolution(dimensions)
+
+            p_matches: list[int] = []
+            stime: float = time.perf_counter()
+            for pair in self._pairs:
+                try:
+                    comparator.compare(source=pair["source"], comparison=pair["comparison"], resize_dimensions=comparator.sample_dimensions)
+                    p_matches.append(comparator.p_match or 0)
+                except (ZeroDivisionError, ValueError) as e:
+                    # eg. a source image with no edges above `line_detect`; count it as no match.
+                    self._logger.debug(f"We encountered an error comparing {pair['name']} | Exception: {e}")
+                    p_matches.append(0)
+            etime: float = time.perf_counter() - stime
+            self._logger.info(f"line_detect={line_detect} sample_percent={sample_percent} sample_dimensions={dimensions} | {len(self._pairs)} comparisons in {etime:.2f} seconds")
+
+            for match_percent in match_percents:
+                precision, recall = self._score(p_matches, match_percent)
+                results.append({
+                    "match_percent": match_percent,
+                    "line_detect": line_detect,
+                    "sample_percent": sample_percent,
+                    "sample_dimensions": dimensions,
+                    "precision": precision,
+                    "recall": recall,
+                    "comparisons_per_second": len(self._pairs) / etime if etime else float("inf")})
+
+        return results
+
+    @staticmethod
+    def recommend(results: list[CalibrationResult], precision: float = 0.95, recall: float = 0.95) -> Union[CalibrationResult, None]:
+        """
+        Finds the fastest result that meets the target precision and recall.
+
+        Args:
+            results (list[CalibrationResult]): Results from `sweep()`.
+            precision (float, optional): 0-1 Minimum precision. Defaults to 0.95.
+            recall (float, optional): 0-1 Minimum recall. Defaults to 0.95.
+
+        Returns:
+            Union[CalibrationResult, None]: The fastest passing result, None if no result meets the targets.
+        """
+        passing: list[CalibrationResult] = [result for result in results if result["precision"] >= precision and result["recall"] >= recall]
+        if not len(passing):
+            return None
+        # ties on speed go to the better combined accuracy.
+        return max(passing, key=lambda result: (result["comparisons_per_second"], result["precision"] + result["recall"]))
+
+    @staticmethod
+    def save_report(results: list[CalibrationResult], report_file: Path) -> None:
+        """
+        Writes `results` to `report_file`; a `.csv` suffix writes CSV otherwise JSON.
+
+        Args:
+            results (list[CalibrationResult]): Results from `sweep()`.
+            report_file (Path): The file to write.
+        """
+        with open(report_file, "w", newline="") as temp_file:
+            if report_file.suffix.lower() == ".csv":
+                writer = csv.DictWriter(temp_file, fieldnames=list(CalibrationResult.__annotations__))
+                writer.writeheader()
+                for result in results:
+                    writer.writerow({**result, "sample_dimensions": "x".join(str(value) for value in result["sample_dimensions"])})
+            else:
+                json.dump(results, temp_file, indent=4)
+
+
+def _dimensions(value: str) -> tuple[int, int]:
+    """Parses `500` or `500x400` into a `(width, height)` tuple."""
+    width, _, height = value.lower().partition("x")
+    return (int(width), int(height or width))
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Image Comparison Calibration")
+    parser.add_argument("-p", "--pairs", help="A CSV of `source,comparison,duplicate` image pairs", required=False, type=Path)
+    parser.add_argument("-s", "--samples", help="A directory of sample images to generate resize/recompress/crop/color-shift pairs from", required=False, type=Path)
+    parser.add_argument("--match-percent", help="match_percent values to sweep", nargs="+", type=int, default=[70, 80, 90, 95])
+    parser.add_argument("--line-detect", help="line_detect values to sweep", nargs="+", type=int, default=[64, 128, 192])
+    parser.add_argument("--sample-percent", help="sample_percent values to sweep", nargs="+", type=int, default=[1, 5, 10, 25])
+    parser.add_argument("--sample-dimensions", help="sample_dimensions values to sweep (eg. 500 or 500x400)", nargs="+", type=_dimensions, default=[(100, 100), (250, 250), (500, 500)])
+    parser.add_argument("--precision", help="The minimum precision of a recommended configuration (0-1)", type=float, default=0.95)
+    parser.add_argument("--recall", help="The minimum recall of a recommended configuration (0-1)", type=float, default=0.95)
+    parser.add_argument("-r", "--report", help="Write every result to a `.json` or `.csv` file", required=False, type=Path)
+    args: Namespace = parser.parse_args()
+
+    logging.basicConfig(format="%(asctime)s [%(levelname)s]  %(message)s", level=logging.INFO, datefmt='%m/%d/%Y %I:%M:%S %p', handlers=[logging.StreamHandler(sys.stdout)])
+    logger = logging.getLogger()
+
+    if args.pairs is None and args.samples is None:
+        logger.error("You must provide labeled pairs with `-p` or sample images with `-s`.")
+        sys.exit(1)
+
+    calibration = Image_Calibration()
+    if args.pairs is not None:
+        calibration.load_pairs(args.pairs)
+    if args.samples is not None:
+        calibration.generate_pairs(args.samples)
+    logger.info(f"Loaded {len(calibration.pairs)} pairs ({sum(pair['duplicate'] for pair in calibration.pairs)} duplicates)...")
+
+    sweep_results: list[CalibrationResult] = calibration.sweep(args.match_percent, args.line_detect, args.sample_percent, args.sample_dimensions)
+    for entry in sorted(sweep_results, key=lambda result: result["comparisons_per_second"], reverse=True):
+        logger.info(f"match_percent={entry['match_percent']} line_detect={entry['line_detect']} sample_percent={entry['sample_percent']} sample_dimensions={entry['sample_dimensions']} | "
+                    f"{entry['comparisons_per_second']:.2f} comparisons/s | precision {entry['precision']:.2f} | recall {entry['recall']:.2f}")
+
+    if args.report is not None:
+        Image_Calibration.save_report(sweep_results, args.report)
+        logger.info(f"Saved calibration report to {args.report.as_posix()}")
+
+    best: Union[CalibrationResult, None] = Image_Calibration.recommend(sweep_results, args.precision, args.recall)
+    if best is None:
+        logger.warning(f"No configuration met precision {args.precision} and recall {args.recall}; try a wider grid.")
+    else:
+        logger.info(f"Recommended: match_percent={best['match_percent']} line_detect={best['line_detect']} sample_percent={best['sample_percent']} sample_dimensions={best['sample_dimensions']} | "
+                    f"{best['comparisons_per_second']:.2f} comparisons/s | precision {best['precision']:.2f} | recall {best['recall']:.2f}")
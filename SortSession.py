@@ -0,0 +1,687 @@
+# Sort Session
+# Keeps the hash database, caches and worker pool warm between sorts so batches can be sorted from a long-lived process.
+
+import csv
+import hashlib
+import json
+import logging
+import os
+import shutil
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Generator, Iterable, TypedDict, TypeVar, Union
+
+from PIL import Image
+
+from HashDatabase import Hash_Database
+
+
+class ImageRes(TypedDict):
+    """`name: str` \n
+    `dimensions: tuple[int, int]`"""
+    name: str
+    dimensions: tuple[int, int]
+
+
+class DuplicateCluster(TypedDict):
+    """`hash: str` \n
+    `keep: Path` \n
+    `duplicates: list[Path]` \n
+    `size: int` - the size of one copy, taken from the duplicates as `keep` may only exist on another node \n
+    `verified: bool` - False when `keep` is a reference DB path we can't read; these are only reported, never removed"""
+    hash: str
+    keep: Path
+    duplicates: list[Path]
+    size: int
+    verified: bool
+
+
+class SortResult(TypedDict):
+    """`source: Path` \n
+    `destination: Path | None` \n
+    `status: str` - one of `moved`, `renamed`, `duplicate`, `deleted`, `quarantined` or `error` \n
+    `hash: str | None` \n
+    `error: str | None`"""
+    source: Path
+    destination: Union[Path, None]
+    status: str
+    hash: Union[str, None]
+    error: Union[str, None]
+
+
+CacheValue = TypeVar("CacheValue")
+
+DUPLICATE_POLICIES: tuple[str, ...] = ("prompt", "keep-first", "keep-largest", "keep-highest-resolution", "quarantine-move", "report-only")
+
+
+@dataclass
+class SortSettings:
+    """The settings of a `SortSession`; these match the `settings.ini` options."""
+    # only needed when `SortSession.sort()` is called without paths.
+    source_dir: Union[Path, None] = None
+    destination_dir: Union[Path, None] = None
+
+    # sort settings
+    sort_wallpapers: bool = False
+    sort_recursive: bool = False
+    hash_pictures: bool = False
+    scale_factor: float = 1.3
+    file_types: tuple[str, ...] = (".png", ".jpg", ".webp", ".jpeg")
+    ignore_directories: Union[list[str], str] = field(default_factory=lambda: ["Low Res", "Mid Res", "High Res", "UHD Res", "Phone Res", "UHDP Res", "Wallpapers"])
+    image_resolutions: list[ImageRes] = field(default_factory=lambda: [
+        {"name": "Low Res", "dimensions": (1440, 900)},
+        {"name": "Mid Res", "dimensions": (1920, 1440)},
+        {"name": "High Res", "dimensions": (2560, 1600)},
+        {"name": "UHD Res", "dimensions": (3840, 2160)},
+        {"name": "UHDP Res", "dimensions": (9000, 9000)},
+        {"name": "Phone Res", "dimensions": (1080, 2400)}])
+
+    # hash database
+    hash_file: Path = field(default_factory=lambda: Path.cwd().joinpath("hashdatabase.json"))
+    reference_files: list[Path] = field(default_factory=list)
+
+    # duplicate handling; `prompt` leaves duplicates for the caller to handle.
+    duplicate_policy: str = "prompt"
+    duplicate_report: Union[Path, None] = None
+    quarantine_dir: Union[Path, None] = None
+    duplicate_workers: int = 4
+    duplicate_batch_size: int = 50
+
+    # the most entries each of the session's hash and dimension caches keep; the least recently used are dropped first.
+    cache_size: int = 10000
+
+
+class SortSession:
+    """
+    Sorts images into resolution folders using `SortSettings`. \n
+    The hash database, hash/dimension caches and duplicate worker pool are created on the first `sort()` and reused until `close()`. \n
+    A session sorts one batch at a time; it is not safe to call `sort()` from several threads at once.
+    """
+
+    def __init__(self, settings: SortSettings) -> None:
+        """
+        Properties:
+            _settings (SortSettings) : The settings used for every `sort()`.
+            _hash_list (dict[str, str]) : The `{hash: path}` entries of our hash database.
+            _reference_hash_list (dict[str, str]) : Read-only `{hash: path}` entries from `reference_files`; never saved.
+            _hash_cache (OrderedDict[tuple[str, int, int], str]) : sha256 digests keyed by `(path, size, mtime)`, limited to `cache_size` entries.
+            _dimension_cache (OrderedDict[tuple[str, int, int], tuple[int, int]]) : Image dimensions keyed by `(path, size, mtime)`, limited to `cache_size` entries.
+            _duplicate_images (list[Path]) : Duplicates found by the last `sort()`.
+            _duplicate_clusters (dict[str, list[Path]]) : Duplicates of the last `sort()` grouped by hash, the first entry is the original.
+            _unverified_references (dict[str, tuple[Path, Path]]) : `{hash: (reference path, image)}` of the last `sort()` where the reference file can't be read to confirm the match.
+            _report (list[DuplicateCluster]) : The duplicate clusters of every `sort()` this session, written to `duplicate_report`.
+            _plan (list[DuplicateCluster]) : The duplicate clusters of the last `sort()`.
+
+        Raises:
+            ValueError: A setting is not valid.
+        """
+        self._logger = logging.getLogger()
+        self._settings: SortSettings = settings
+        if self._settings.destination_dir is None or not self._settings.destination_dir.exists():
+            raise ValueError(f"The DESTINATION path you provided is not valid. -> {self._settings.destination_dir}")
+        if self._settings.duplicate_policy not in DUPLICATE_POLICIES:
+            raise ValueError(f"The DUPLICATE_POLICY you provided is not valid. -> {self._settings.duplicate_policy} | Options: {', '.join(DUPLICATE_POLICIES)}")
+        self._source_dir: Union[Path, None] = self._settings.source_dir
+        self._destination_dir: Path = self._settings.destination_dir
+        # resolved defaults are kept on the session; `settings` is never modified.
+        self._quarantine_dir: Union[Path, None] = self._settings.quarantine_dir
+        if self._settings.duplicate_policy == "quarantine-move" and self._quarantine_dir is None:
+            self._quarantine_dir = self._destination_dir.joinpath("Duplicates")
+        self._duplicate_report: Path = self._settings.duplicate_report or Path.cwd().joinpath("duplicatereport.json")
+
+        self._ready: bool = False
+        self._hash_database: Union[Hash_Database, None] = None
+        self._hash_list: dict[str, str] = {}  # {"b7abe0e999528837a9588bdf82f37183262b9f0775772491468a78107c285d96": "h:\\picture\\anime\\037533e1272fd9f6fd860abac4c5f1c3.png"}
+        self._reference_hash_list: dict[str, str] = {}
+        self._hash_cache: OrderedDict[tuple[str, int, int], str] = OrderedDict()
+        self._dimension_cache: OrderedDict[tuple[str, int, int], tuple[int, int]] = OrderedDict()
+        self._pool: Union[ThreadPoolExecutor, None] = None
+
+        self._results: dict[Path, SortResult] = {}
+        self._duplicate_images: list[Path] = []
+        self._duplicate_clusters: dict[str, list[Path]] = {}
+        self._unverified_references: dict[str, tuple[Path, Path]] = {}
+        self._report: list[DuplicateCluster] = []
+        self._plan: list[DuplicateCluster] = []
+
+    def __enter__(self) -> "SortSession":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    @property
+    def settings(self) -> SortSettings:
+        """
+        The settings used for every `sort()`.
+
+        Returns:
+            SortSettings: The `_settings` value.
+        """
+        return self._settings
+
+    @property
+    def duplicate_images(self) -> list[Path]:
+        """
+        Duplicates found by the last `sort()`; with the `prompt` policy these are left for the caller to handle.
+
+        Returns:
+            list[Path]: The `_duplicate_images` value.
+        """
+        return self._duplicate_images
+
+    @property
+    def duplicate_plan(self) -> list[DuplicateCluster]:
+        """
+        The duplicate clusters of the last `sort()`, the same data written to its duplicate report.
+
+        Returns:
+            list[DuplicateCluster]: The `_plan` value.
+        """
+        return self._plan
+
+    def sort(self, paths: Union[Iterable[Path], None] = None) -> list[SortResult]:
+        """
+        Sorts `paths` into the destination directory and handles any duplicates found using `duplicate_policy`. \n
+        The hash database is loaded on the first call and kept in memory; call `save()` or `close()` to write it.
+
+        Args:
+            paths (Union[Iterable[Path], None], optional): The images to sort. Defaults to None which sorts the source directory.
+
+        Raises:
+            ValueError: `paths` is None and `source_dir` is not set or does not exist.
+
+        Returns:
+            list[SortResult]: One result per image, in the order they were sorted.
+        """
+        if paths is None and (self._source_dir is None or not self._source_dir.exists()):
+            raise ValueError(f"The SOURCE path you provided is not valid. -> {self._source_dir}")
+        self._open()
+        self._results = {}
+        self._duplicate_images = []
+        self._duplicate_clusters = {}
+        self._unverified_references = {}
+        self._plan = []
+
+        self._image_sort(self._image_list_generator() if paths is None else [Path(path) for path in paths])
+        self._duplicate_resolve()
+        return list(self._results.values())
+
+    def save(self) -> None:
+        """Saves our hash database if `hash_pictures` is enabled and it has been loaded."""
+        if not self._settings.hash_pictures or self._hash_database is None:
+            return
+        try:
+            self._hash_database.save(self._hash_list)
+        except Exception as e:
+            self._logger.error(f"We encountered an Error when saving our hash database {self._settings.hash_file.as_posix()} | Exception: {e}")
+            return
+
+        self._logger.info(f"Saved {self._settings.hash_file.as_posix()}")
+
+    def close(self) -> None:
+        """Saves our hash database and shuts down the duplicate worker pool."""
+        self.save()
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _open(self) -> None:
+        """Creates our destination folders and loads the hash databases the first time the session is used."""
+        if self._ready:
+            return
+        self._image_dir_creation()
+        if self._settings.hash_pictures:
+            self._hash_database_load()
+        self._ready = True
+
+    def _stat_key(self, image: Path) -> Union[tuple[str, int, int], None]:
+        """Returns the `(path, size, mtime)` cache key of `image` or None if it cannot be read."""
+        try:
+            stat: os.stat_result = image.stat()
+        except OSError:
+            return None
+        return (image.as_posix(), stat.st_size, stat.st_mtime_ns)
+
+    def _file_hash(self, image: Path) -> str:
+        """Returns the sha256 digest of `image`, reusing `_hash_cache` if the file has not changed."""
+        key: Union[tuple[str, int, int], None] = self._stat_key(image)
+        cached: Union[str, None] = self._cache_get(self._hash_cache, key)
+        if cached is not None:
+            return cached
+        with open(image.as_posix(), "rb") as temp_file:
+            image_hash: str = hashlib.sha256(temp_file.read()).hexdigest()
+        if key is not None:
+            self._cache_put(self._hash_cache, key, image_hash)
+        return image_hash
+
+    def _file_size(self, image: Path) -> int:
+        """Returns the size of `image` in bytes or `-1` if it cannot be read."""
+        key: Union[tuple[str, int, int], None] = self._stat_key(image)
+        return -1 if key is None else key[1]
+
+    def _image_dimensions(self, image: Path) -> tuple[int, int]:
+        """Returns the `(width, height)` of `image`, reusing `_dimension_cache` if the file has not changed.
+
+        Raises:
+            Exception: Any error PIL raises opening the image."""
+        key: Union[tuple[str, int, int], None] = self._stat_key(image)
+        cached: Union[tuple[int, int], None] = self._cache_get(self._dimension_cache, key)
+        if cached is not None:
+            return cached
+        with Image.open(image) as cur_image:
+            dimensions: tuple[int, int] = (cur_image.width, cur_image.height)
+        if key is not None:
+            self._cache_put(self._dimension_cache, key, dimensions)
+        return dimensions
+
+    def _image_pixels(self, image: Path) -> int:
+        """Returns the `width * height` of `image` or `-1` if it cannot be opened."""
+        try:
+            width, height = self._image_dimensions(image)
+        except Exception:
+            return -1
+        return width * height
+
+    def _cache_get(self, cache: "OrderedDict[tuple[str, int, int], CacheValue]", key: Union[tuple[str, int, int], None]) -> Union[CacheValue, None]:
+        """Returns the `cache` entry of `key` and marks it as recently used, None if it isn't cached."""
+        if key is None or key not in cache:
+            return None
+        cache.move_to_end(key)
+        return cache[key]
+
+    def _cache_put(self, cache: "OrderedDict[tuple[str, int, int], CacheValue]", key: tuple[str, int, int], value: CacheValue) -> None:
+        """Adds `key` to `cache`, dropping the least recently used entries past `cache_size`."""
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > max(0, self._settings.cache_size):
+            cache.popitem(last=False)
+
+    def _cache_forget(self, key: Union[tuple[str, int, int], None]) -> None:
+        """Drops `key` from our caches once its file has been moved or removed."""
+        if key is None:
+            return
+        self._hash_cache.pop(key, None)
+        self._dimension_cache.pop(key, None)
+
+    def _image_moved(self, image_hash: str, source_key: Union[tuple[str, int, int], None], destination: Path) -> None:
+        """Carries the cached hash/dimensions of a moved image over to `destination` so later batches don't re-read it."""
+        dimensions: Union[tuple[int, int], None] = None if source_key is None else self._dimension_cache.get(source_key)
+        self._cache_forget(source_key)
+        new_key: Union[tuple[str, int, int], None] = self._stat_key(destination)
+        if new_key is None:
+            return
+        self._cache_put(self._hash_cache, new_key, image_hash)
+        if dimensions is not None:
+            self._cache_put(self._dimension_cache, new_key, dimensions)
+
+    def _image_dir_creation(self) -> None:
+        """ Creates Directories based upon `image_resolutions` "name" field."""
+        for entry in self._settings.image_resolutions:
+            cur_path: Path = self._destination_dir.joinpath(entry["name"])
+            if not cur_path.exists():
+                cur_path.mkdir()
+                self._logger.info(entry["name"] + " folder created!")
+
+        if self._settings.sort_wallpapers:
+            cur_path: Path = self._destination_dir.joinpath("Wallpapers")
+            if not cur_path.exists():
+                cur_path.mkdir()
+                self._logger.info("Wallpapers folder created!")
+
+        if self._settings.duplicate_policy == "quarantine-move" and self._quarantine_dir is not None:
+            if not self._quarantine_dir.exists():
+                self._quarantine_dir.mkdir(parents=True)
+                self._logger.info("Duplicates folder created!")
+
+    def _image_list_generator(self) -> list[Path]:
+        """Creates a list of Path objects of all images that match `file_types`.
+
+        IF `sort_recursive == True` it will also `glob` all matching `file_types` of sub directories."""
+        _image_list: list = []
+        if self._source_dir is None:
+            return _image_list
+        for file in self._source_dir.iterdir():
+            if file.is_file() and file.name.lower().endswith(self._settings.file_types):
+                _image_list.append(file)
+
+            if file.is_dir():
+                # Ignore our destination path if it is in the same directory as our source path.
+                if str(file.absolute()) == self._destination_dir or file.name in self._settings.ignore_directories or file == self._quarantine_dir:
+                    # self._logger.warn(f"Found an unwanted directory {file.name}; skipping~")
+                    continue
+
+                if self._settings.sort_recursive:
+                    for suffix in self._settings.file_types:
+                        file_list: Generator[Path, None, None] = file.glob(("*" + suffix))
+                        for sub_file in file_list:
+                            _image_list.append(sub_file)
+
+        return _image_list
+
+    def _result(self, image: Path, status: str, destination: Union[Path, None] = None, image_hash: Union[str, None] = None, error: Union[str, None] = None) -> None:
+        """Records the `SortResult` of `image` for the current `sort()`."""
+        self._results[image] = {"source": image, "destination": destination, "status": status, "hash": image_hash, "error": error}
+
+    def _image_sort(self, image_list: list[Path]) -> None:
+        """Sorts images into their respective resolution boundaries specified by `image_resolutions` or into a `Wallpaper` folder if enabled."""
+        move: int = 0
+        imagewidth: int
+        imageheight: int
+        self._logger.info(f"Found {len(image_list)} images to sort...")
+        for image in image_list:
+            _output_dir: Path = self._destination_dir
+            _wallpaper: bool = False
+            _source_key: Union[tuple[str, int, int], None] = self._stat_key(image)
+            try:
+                cur_image_hash: str = self._file_hash(image)
+                cur_width, cur_height = self._image_dimensions(image)
+
+            except Exception as e:
+                self._logger.error(f"We encountered an error opening {image.name} | Exception: {e}")
+                self._result(image, "error", error=str(e))
+                continue
+
+            # image sorting of wallpapers
+            if self._settings.sort_wallpapers:
+                if (cur_width / cur_height) > self._settings.scale_factor:
+                    _output_dir = self._destination_dir.joinpath("Wallpapers")
+                    _wallpaper = True
+
+            # image sorting via dictionary dimensions comparison" > = GREATER THAN | < = LESS THAN "
+            if not _wallpaper:
+                # imageres is the dictionary with all dimensions
+                # range function starts at X value and ends at Y-1 (range(X,Y-1)) count = interation value
+                # value 1, value 2 = IMGRES[int][dictionary key]
+                # if value 1 >= cur_width(opened image) and value 2 >= cur_height(opened image)
+                for move in range(0, len(self._settings.image_resolutions)):
+                    imagewidth, imageheight = self._settings.image_resolutions[move]["dimensions"]
+                    if not (imagewidth >= cur_width) and not (imageheight >= cur_height):
+                        continue
+
+                    else:
+                        _output_dir = self._destination_dir.joinpath(self._settings.image_resolutions[move]["name"])
+
+            if self._settings.hash_pictures:
+                if cur_image_hash not in self._hash_list and cur_image_hash not in self._reference_hash_list:
+                    self._hash_list[cur_image_hash] = _output_dir.joinpath(image.name).as_posix()
+                else:
+                    if self._validate_file_hash(image, cur_image_hash, _output_dir.joinpath(image.name)):
+                        continue
+
+            # Move our image to the destination path we set.
+            try:
+                shutil.move(image.as_posix(), _output_dir)
+                self._image_moved(cur_image_hash, _source_key, _output_dir.joinpath(image.name))
+                self._result(image, "moved", _output_dir.joinpath(image.name), cur_image_hash)
+                self._logger.info(f'Moved {image.name} | {image.parent.as_posix()} >> {_output_dir.as_posix()}')
+
+            except shutil.Error as e:
+                # we only care about duplicate file/path issues.
+                if isinstance(e.args[0], str) and e.args[0].startswith("Destination path"):  # type:ignore
+                    # This typically triggers if the image failed the _validate_file_hash.
+                    if image in self._duplicate_images:
+                        continue
+
+                    # Try to move picture A into dir; dir has pic A already (so we will call it pic B). We compare the has of pic A to pic B.
+                    # if the has of pic A and pic B match; we should skip moving pic A entirely.
+                    _image_output: str = _output_dir.joinpath(image.name).as_posix()
+                    file2hash: str = self._file_hash(Path(_image_output))
+                    if cur_image_hash == file2hash:
+                        self._duplicate_add(cur_image_hash, Path(_image_output), image)
+                        continue
+
+                    else:
+                        _num_increment: int = 1
+                        _file_output: str = _output_dir.as_posix() + "/" + image.stem + "_" + str(_num_increment) + image.suffix
+                        while (Path(_file_output).exists()):
+                            _num_increment += 1
+                            _file_output = _output_dir.as_posix() + "/" + image.stem + "_" + str(_num_increment) + image.suffix
+                        try:
+                            new_image: Path = image.rename(_file_output)
+                            self._image_moved(cur_image_hash, _source_key, new_image)
+                            self._result(image, "renamed", new_image, cur_image_hash)
+                            self._logger.warning(msg="Duplicate file name found at " + _image_output + " --> Renaming file..." + new_image.name)
+                        except OSError as e:
+                            self._logger.error(msg=f"We encountered an error renaming {image.name} | Exception: {e}")
+                            self._result(image, "error", image_hash=cur_image_hash, error=str(e))
+                            continue
+                else:
+                    self._logger.error(f"We encountered an error moving {image.name} | Exception: {e}")
+                    self._result(image, "error", image_hash=cur_image_hash, error=str(e))
+
+            except PermissionError as e:
+                self._logger.error(f"We encountered a Permissions Error when moving {image.name} | Exception: {e}")
+                self._result(image, "error", image_hash=cur_image_hash, error=str(e))
+
+            except OSError as e:
+                self._logger.error(msg="We encountered an error moving " + image.name + f" | Exception: {e}")
+                self._result(image, "error", image_hash=cur_image_hash, error=str(e))
+                continue
+
+    def _hash_database_load(self) -> None:
+        """Loads our hash database (a `.json` file or a sharded directory) if it exists; otherwise it is created on save.
+
+        Also loads any `reference_files` into `_reference_hash_list` as read-only databases."""
+        self._hash_database = Hash_Database(self._settings.hash_file)
+        if self._settings.hash_file.exists():
+            self._hash_list = self._hash_database.load()
+            self._logger.info(f"loaded {len(self._hash_list)} hashes from {self._settings.hash_file.as_posix()}")
+        else:
+            self._logger.warning(f"Unable to find {self._settings.hash_file.as_posix()}, creating the database on save.")
+
+        for reference in self._settings.reference_files:
+            if not reference.exists():
+                self._logger.error(f"Unable to find the reference hash database {reference.as_posix()}; skipping~")
+                continue
+            # earlier references win, same as `Hash_Database.merge`.
+            for image_hash, image_path in Hash_Database(reference, read_only=True).load().items():
+                self._reference_hash_list.setdefault(image_hash, image_path)
+            self._logger.info(f"loaded reference hash database {reference.as_posix()}")
+
+    def _duplicate_add(self, image_hash: str, original: Path, duplicate: Path) -> None:
+        """Adds `duplicate` to `_duplicate_images` and groups it with `original` in `_duplicate_clusters` by hash."""
+        if duplicate in self._duplicate_images:
+            return
+        self._duplicate_images.append(duplicate)
+        self._duplicate_clusters.setdefault(image_hash, [original]).append(duplicate)
+        self._result(duplicate, "duplicate", original, image_hash)
+
+    def _duplicate_plan(self) -> list[DuplicateCluster]:
+        """Decides which image of each entry in `_duplicate_clusters` to keep based upon `duplicate_policy`.
+
+        `keep-largest` and `keep-highest-resolution` fall back to the first found image on a tie.
+        Clusters found through `_reference_hash_list` always keep the reference image.
+        `_unverified_references` are added as `verified: False` clusters of the image's sorted location."""
+        plan: list[DuplicateCluster] = []
+        for image_hash, cluster in self._duplicate_clusters.items():
+            keep: Path = cluster[0]
+            # a hash only found in a reference DB belongs to another node; never touch its file.
+            if image_hash not in self._hash_list and image_hash in self._reference_hash_list:
+                pass
+            elif self._settings.duplicate_policy == "keep-largest":
+                keep = max(cluster, key=self._file_size)
+            elif self._settings.duplicate_policy == "keep-highest-resolution":
+                keep = max(cluster, key=self._image_pixels)
+
+            duplicates: list[Path] = [image for image in cluster if image != keep]
+            plan.append({"hash": image_hash, "keep": keep, "duplicates": duplicates, "size": max([self._file_size(image) for image in duplicates] + [0]), "verified": True})
+
+        for image_hash, (reference, image) in self._unverified_references.items():
+            local: Union[Path, None] = self._results[image]["destination"] if image in self._results else None
+            if local is None:
+                local = image
+            plan.append({"hash": image_hash, "keep": reference, "duplicates": [local], "size": max(self._file_size(local), 0), "verified": False})
+        return plan
+
+    def _duplicate_report_save(self, plan: list[DuplicateCluster]) -> None:
+        """Writes the duplicate-cluster `plan` to `duplicate_report`; a `.csv` suffix writes one row per duplicate otherwise JSON.
+
+        A session keeps a single report; `_duplicate_resolve` passes every cluster found so far so later batches update it."""
+        report: Path = self._duplicate_report
+
+        _reclaimable: int = sum(cluster["size"] * len(cluster["duplicates"]) for cluster in plan)
+        _unverified: int = sum(cluster["size"] * len(cluster["duplicates"]) for cluster in plan if not cluster["verified"])
+        try:
+            with open(report, "w", newline="") as temp_file:
+                if report.suffix.lower() == ".csv":
+                    writer = csv.writer(temp_file)
+                    writer.writerow(["hash", "keep", "duplicate", "size", "verified", "policy"])
+                    for cluster in plan:
+                        for image in cluster["duplicates"]:
+                            writer.writerow([cluster["hash"], cluster["keep"].as_posix(), image.as_posix(), cluster["size"], cluster["verified"], self._settings.duplicate_policy])
+                else:
+                    json.dump({
+                        "policy": self._settings.duplicate_policy,
+                        "clusters": len(plan),
+                        "duplicates": sum(len(cluster["duplicates"]) for cluster in plan),
+                        "reclaimable_bytes": _reclaimable,
+                        "unverified_bytes": _unverified,
+                        "entries": [{
+                            "hash": cluster["hash"],
+                            "keep": cluster["keep"].as_posix(),
+                            "duplicates": [image.as_posix() for image in cluster["duplicates"]],
+                            "size": cluster["size"],
+                            "verified": cluster["verified"],
+                            "reclaimable_bytes": cluster["size"] * len(cluster["duplicates"])} for cluster in plan]}, temp_file, indent=4)
+        except OSError as e:
+            self._logger.error(f"We encountered an Error when saving our duplicate report {report.as_posix()} | Exception: {e}")
+            return
+
+        self._logger.info(f"Saved duplicate report to {report.as_posix()} | {_reclaimable} bytes reclaimable ({_unverified} bytes unverified).")
+
+    def _duplicate_batch(self, batch: list[tuple[str, Path]]) -> tuple[list[Path], int]:
+        """Deletes (or moves into `quarantine_dir` for `quarantine-move`) every image in `batch`.
+
+        Returns:
+            tuple[list[Path], int]: The images handled and the bytes removed from their original location."""
+        handled: list[Path] = []
+        reclaimed: int = 0
+        for image_hash, image in batch:
+            key: Union[tuple[str, int, int], None] = self._stat_key(image)
+            size: int = 0 if key is None else key[1]
+            try:
+                if self._settings.duplicate_policy == "quarantine-move" and self._quarantine_dir is not None:
+                    # prefix the hash so images sharing a name from different folders don't collide.
+                    shutil.move(image.as_posix(), self._quarantine_dir.joinpath(image_hash[:12] + "_" + image.name).as_posix())
+                else:
+                    os.remove(image.as_posix())
+            except OSError as e:
+                self._logger.error(f"We encountered an error removing duplicate {image.as_posix()} | Exception: {e}")
+                continue
+            self._cache_forget(key)
+            handled.append(image)
+            reclaimed += size
+        return handled, reclaimed
+
+    def _duplicate_resolve(self) -> None:
+        """Handles `_duplicate_clusters` without prompting, based upon `duplicate_policy`.
+
+        Writes a report for `report-only` or if `duplicate_report` is set; `prompt` leaves `duplicate_images` for the caller.
+        Unverified reference matches are only reported.
+        Deletions/quarantine moves are split into batches of `duplicate_batch_size` and run on the session's worker pool."""
+        if not len(self._duplicate_clusters) and not len(self._unverified_references):
+            return
+        plan: list[DuplicateCluster] = self._duplicate_plan()
+        self._plan = plan
+        self._logger.info(f"Found {len(self._duplicate_images)} duplicate images in {len(self._duplicate_clusters)} clusters...")
+        if len(self._unverified_references):
+            self._logger.warning(f"Found {len(self._unverified_references)} images matching a reference hash database we can't verify; these are sorted and reported only.")
+        if self._settings.duplicate_report is not None or self._settings.duplicate_policy == "report-only":
+            self._report.extend(plan)
+            self._duplicate_report_save(self._report)
+        if self._settings.duplicate_policy in ("prompt", "report-only"):
+            return
+
+        plan = [cluster for cluster in plan if cluster["verified"]]
+        _removals: list[tuple[str, Path]] = [(cluster["hash"], image) for cluster in plan for image in cluster["duplicates"]]
+        # the kept image may have been the sorted copy; keep the hash DB pointing at a file that still exists.
+        for cluster in plan:
+            if cluster["hash"] in self._hash_list:
+                self._hash_list[cluster["hash"]] = cluster["keep"].as_posix()
+
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=max(1, self._settings.duplicate_workers))
+        _batch_size: int = max(1, self._settings.duplicate_batch_size)
+        _batches: list[list[tuple[str, Path]]] = [_removals[index:index + _batch_size] for index in range(0, len(_removals), _batch_size)]
+        _status: str = "quarantined" if self._settings.duplicate_policy == "quarantine-move" else "deleted"
+        count: int = 0
+        reclaimed: int = 0
+        for handled, batch_reclaimed in self._pool.map(self._duplicate_batch, _batches):
+            for image in handled:
+                if image in self._results:
+                    self._results[image]["status"] = _status
+            count += len(handled)
+            reclaimed += batch_reclaimed
+
+        self._logger.info(f"{_status.capitalize()} {count} duplicate images | {reclaimed} bytes reclaimed.")
+
+    def _validate_file_hash(self, image_dir: Path, image_hash: str, image_output_path: Path) -> bool | None:
+        """Compares the hash of the current image against the hash of the image in the DB.
+         If the current image hash exists in the DB.
+            We use the existing hash and open the file path it specifies.
+
+            `IF the file path NO LONGER exists` we update the DB with the current image's output directory and hash then continue.
+
+            `ELSE` We then re-hash the file path from the DB against the current image hash;
+
+         `IF they MATCH` we add the current image as a duplicate image and prompt deletion later.
+
+         `IF they DO NOT` match we update the file path with the current image's output directory (if it changes) and continue.
+
+         `IF` by any chance the hash of the existing file path already exists; we continue the above process of the existing image against the DB's existing image path.. etc etc..
+
+         If the hash is ONLY in `_reference_hash_list` we see `_validate_reference_hash`.
+         """
+        if image_hash not in self._hash_list:
+            return self._validate_reference_hash(image_dir, image_hash, image_output_path)
+
+        # need to compare the new image and the old image hashs
+        # need to update the hash list if they no longer match.
+        # using the "hash" that already exists as a key to get a Path(str)
+        _existing_file: Path = Path(self._hash_list[image_hash])
+
+        # if the hash path is invalid; update the hash and the path entry.
+        if not _existing_file.exists():
+            self._hash_list[image_hash] = image_output_path.as_posix()
+            return False
+
+        # the file path exists; compare the old image to the new one.
+        else:
+            _temp_hash: str = self._file_hash(_existing_file)
+            if _temp_hash == image_hash:
+                self._duplicate_add(image_hash, _existing_file, image_dir)
+                return True
+
+            elif _temp_hash not in self._hash_list:
+                # first we update our DB with the new hash and get its path using the old hash.
+                # then we update the old hash with a new path.
+                self._hash_list[_temp_hash] = _existing_file.as_posix()
+                self._hash_list[image_hash] = image_output_path.as_posix()
+
+            else:
+                # if the new hash is "somehow" in the DB already; perform a validation.
+                self._validate_file_hash(_existing_file, _temp_hash, image_output_path)
+
+    def _validate_reference_hash(self, image_dir: Path, image_hash: str, image_output_path: Path) -> bool:
+        """Compares the current image against a read-only reference DB entry; the reference DB is never updated.
+
+         `IF the file path exists` we re-hash it; a match adds the current image as a duplicate, otherwise the current image is added to our own DB.
+
+         `ELSE` the path belongs to another node (or is stale) so the match can't be verified; the current image is sorted and added to our own DB as normal and only reported via `_unverified_references`.
+         """
+        _reference_file: Path = Path(self._reference_hash_list[image_hash])
+        if not _reference_file.exists():
+            self._hash_list[image_hash] = image_output_path.as_posix()
+            self._unverified_references[image_hash] = (_reference_file, image_dir)
+            return False
+
+        _temp_hash: str = self._file_hash(_reference_file)
+        if _temp_hash != image_hash:
+            self._hash_list[image_hash] = image_output_path.as_posix()
+            return False
+
+        self._duplicate_add(image_hash, _reference_file, image_dir)
+        return True